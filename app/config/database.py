@@ -1,24 +1,27 @@
-from pymongo import MongoClient
-from pymongo.database import Database
-from contextlib import asynccontextmanager
+import asyncio
+import logging
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 from typing import Optional
 from app.config.settings import get_settings
 
 
+logger = logging.getLogger(__name__)
+
+
 class MongoDatabase:
     """MongoDB connection manager."""
     
     _instance: Optional['MongoDatabase'] = None
-    _client: Optional[MongoClient] = None
-    _database: Optional[Database] = None
+    _client: Optional[AsyncIOMotorClient] = None
+    _database: Optional[AsyncIOMotorDatabase] = None
     
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(MongoDatabase, cls).__new__(cls)
         return cls._instance
     
-    def connect(self):
-        """Initialize MongoDB connection."""
+    def _create_client(self):
+        """Create the Motor client (no network IO until first operation)."""
         if self._client is None:
             settings = get_settings()
             
@@ -32,11 +35,45 @@ class MongoDatabase:
             else:
                 mongodb_uri = f"mongodb://{settings.mongodb_host}:{settings.mongodb_port}"
             
-            self._client = MongoClient(mongodb_uri)
+            self._client = AsyncIOMotorClient(
+                mongodb_uri,
+                maxPoolSize=settings.mongodb_max_pool_size,
+                minPoolSize=settings.mongodb_min_pool_size,
+                maxIdleTimeMS=settings.mongodb_max_idle_ms,
+                waitQueueTimeoutMS=settings.mongodb_wait_queue_timeout_ms,
+                retryWrites=True,
+                appname="sevico"
+            )
             self._database = self._client[settings.mongodb_db_name]
-            # Verify connection
-            self._client.admin.command('ping')
-            print(f"Connected to MongoDB: {settings.mongodb_db_name}")
+    
+    async def connect(self):
+        """Initialize MongoDB connection."""
+        self._create_client()
+        settings = get_settings()
+        # Verify connection
+        client = self._client
+        assert client is not None
+        await client.admin.command('ping')
+        await self._prewarm(client, settings.mongodb_min_pool_size)
+        logger.info(f"Connected to MongoDB: {settings.mongodb_db_name}")
+    
+    async def ensure_indexes(self):
+        """Create the indexes the auth queries rely on."""
+        users = self.get_collection("users")
+        await users.create_index("email", unique=True, name="email_unique")
+        # Drop unverified sign-ups once their code expires; verified users
+        # hold a null expiry and are never matched by the TTL monitor.
+        await users.create_index(
+            "verification_code_expires_at",
+            expireAfterSeconds=0,
+            name="verification_code_ttl"
+        )
+    
+    async def _prewarm(self, client: AsyncIOMotorClient, size: int):
+        """Open pool sockets up front with a concurrent burst of pings."""
+        if size <= 1:
+            return
+        await asyncio.gather(*(client.admin.command('ping') for _ in range(size)))
     
     def disconnect(self):
         """Close MongoDB connection."""
@@ -44,12 +81,12 @@ class MongoDatabase:
             self._client.close()
             self._client = None
             self._database = None
-            print("Disconnected from MongoDB")
+            logger.info("Disconnected from MongoDB")
     
-    def get_database(self) -> Database:
+    def get_database(self) -> AsyncIOMotorDatabase:
         """Get the database instance."""
         if self._database is None:
-            self.connect()
+            self._create_client()
         return self._database
     
     def get_collection(self, collection_name: str):
@@ -61,6 +98,6 @@ class MongoDatabase:
 db = MongoDatabase()
 
 
-def get_db() -> Database:
+def get_db() -> AsyncIOMotorDatabase:
     """Dependency injection for database."""
     return db.get_database()
@@ -1,7 +1,7 @@
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from functools import lru_cache
 import os
-from typing import Optional
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
@@ -16,6 +16,9 @@ class Settings(BaseSettings):
     app_host: str = "0.0.0.0"
     app_port: int = 8002
     
+    # CORS Configuration (JSON list in env, e.g. CORS_ORIGINS='["https://app.example.com"]')
+    cors_origins: List[str] = ["http://localhost:3000"]
+    
     # MongoDB Configuration
     mongodb_host: str = "localhost"
     mongodb_port: int = 27017
@@ -23,12 +26,17 @@ class Settings(BaseSettings):
     mongodb_password: str = "your-password"
     mongodb_db_name: str = "sevico_db"
     mongodb_auth_source: str = "admin"
+    mongodb_max_pool_size: int = 256
+    mongodb_min_pool_size: int = 10
+    mongodb_max_idle_ms: int = 300_000
+    mongodb_wait_queue_timeout_ms: int = 2000
     
     # JWT Configuration
     jwt_secret_key: str = "your-jwt-secret-key-change-in-production"
     jwt_algorithm: str = "HS256"
     jwt_expiration_hours: int = 24
     refresh_token_expiration_days: int = 7
+    jwt_verify_cache_enabled: bool = False  # Cache verified payloads for a few seconds
     
     # Email Configuration (SMTP)
     smtp_host: str = "email-smtp.us-east-1.amazonaws.com"
@@ -36,6 +44,8 @@ class Settings(BaseSettings):
     smtp_username: str = "your-username"
     smtp_password: str = "your-password"
     smtp_tls: bool = True
+    smtp_use_ssl: bool = False  # Implicit TLS (SMTPS); always used on port 465
+    smtp_timeout_seconds: int = 30
     sender_email: str = "your-email@example.com"
     sender_name: str = "Your Name"
     aws_ses_configuration_set: str = ""  # Optional: AWS SES Configuration Set name
@@ -48,16 +58,19 @@ class Settings(BaseSettings):
     password_reset_expiration_hours: int = 1
     verification_code_expiration_minutes: int = 15
     
-    # Password Reset Configuration
-    password_reset_expiration_hours: int = 1
-    verification_code_expiration_minutes: int = 15
+    # User Profile Cache Configuration
+    user_cache_max_size: int = 4096
+    user_cache_ttl_seconds: int = 30
     
-    class Config:
-        env_file = ".env"
-        case_sensitive = False
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=False,
+        extra="ignore"
+    )
 
 
-@lru_cache()
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
     """Get cached settings instance."""
     return Settings()
@@ -1,11 +1,14 @@
 from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
+import asyncio
 import logging
-from contextlib import asynccontextmanager
+from contextlib import AsyncExitStack, asynccontextmanager
 from app.config.settings import get_settings
 from app.config.database import db
 from app.routes import auth_routes
+from app.services.email_service import get_email_service
+from app.utils.password_helper import start_password_executor, shutdown_password_executor
 import secrets
 
 
@@ -19,6 +22,10 @@ logger = logging.getLogger(__name__)
 # HTTP Basic Auth for docs
 security = HTTPBasic()
 
+# Docs credentials, configurable via environment variables
+_DOCS_USER = get_settings().docs_username.encode()
+_DOCS_PASS = get_settings().docs_password.encode()
+
 
 def verify_docs_credentials(credentials: HTTPBasicCredentials = Depends(security)) -> bool:
     """
@@ -26,17 +33,13 @@ def verify_docs_credentials(credentials: HTTPBasicCredentials = Depends(security
     Default username: admin, password: admin
     Change these in environment variables in production.
     """
-    settings = get_settings()
-    
-    # You can configure these via environment variables
-    docs_username = getattr(settings, 'docs_username', 'admin')
-    docs_password = getattr(settings, 'docs_password', 'admin')
-    
-    # Verify credentials
-    is_username_correct = secrets.compare_digest(credentials.username, docs_username)
-    is_password_correct = secrets.compare_digest(credentials.password, docs_password)
+    # Compare as bytes so non-ASCII input can't raise, and evaluate both
+    # digests without short-circuiting to avoid leaking which one failed
+    user_b = credentials.username.encode("utf-8", "replace")
+    pw_b = credentials.password.encode("utf-8", "replace")
+    is_valid = secrets.compare_digest(user_b, _DOCS_USER) & secrets.compare_digest(pw_b, _DOCS_PASS)
     
-    if not (is_username_correct and is_password_correct):
+    if not is_valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials for documentation access",
@@ -47,23 +50,76 @@ def verify_docs_credentials(credentials: HTTPBasicCredentials = Depends(security
 
 
 @asynccontextmanager
-async def lifespan(app: FastAPI):
-    """Lifespan context manager for startup and shutdown events."""
-    # Startup
-    logger.info("Starting FastAPI application...")
+async def db_lifespan(app: FastAPI):
+    """Connect to MongoDB and ensure indexes for the lifetime of the app."""
     try:
-        db.connect()
-        logger.info("Database connection established")
-    except Exception as e:
-        logger.error(f"Failed to connect to database: {str(e)}")
-        raise
-    
+        try:
+            await db.connect()
+            await db.ensure_indexes()
+            logger.info("Database connection established")
+        except Exception as e:
+            logger.error(f"Failed to connect to database: {str(e)}")
+            raise
+        
+        yield
+    finally:
+        # Also runs if startup fails or is cancelled part-way through
+        db.disconnect()
+        logger.info("Database connection closed")
+
+
+@asynccontextmanager
+async def password_executor_lifespan(app: FastAPI):
+    """Run the bcrypt thread pool for the lifetime of the app."""
+    start_password_executor()
+    try:
+        yield
+    finally:
+        shutdown_password_executor()
+
+
+@asynccontextmanager
+async def email_lifespan(app: FastAPI):
+    """Build the email service at startup so missing SMTP config fails the boot."""
+    get_email_service()
     yield
+
+
+async def enter_concurrently(stack: AsyncExitStack, *contexts):
+    """
+    Enter async context managers on the stack concurrently.
     
-    # Shutdown
-    logger.info("Shutting down FastAPI application...")
-    db.disconnect()
-    logger.info("Database connection closed")
+    If any of them fails, the ones still starting are cancelled and awaited
+    before the error propagates, so none can register on a stack that is
+    already unwinding; those that did start are unwound by the stack.
+    """
+    tasks = [asyncio.ensure_future(stack.enter_async_context(cm)) for cm in contexts]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Lifespan context manager for startup and shutdown events."""
+    # Startup: independent subsystems start concurrently
+    logger.info("Starting FastAPI application...")
+    async with AsyncExitStack() as stack:
+        await enter_concurrently(
+            stack,
+            db_lifespan(app),
+            password_executor_lifespan(app),
+            email_lifespan(app),
+        )
+        
+        yield
+        
+        # Shutdown: the exit stack unwinds each subsystem
+        logger.info("Shutting down FastAPI application...")
 
 
 # Create FastAPI app with custom docs settings
@@ -77,13 +133,13 @@ app = FastAPI(
     openapi_url="/api/openapi.json"
 )
 
-# CORS middleware
+# CORS middleware (explicit lists; "*" is not honoured with credentials)
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=get_settings().cors_origins,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=("GET", "POST"),
+    allow_headers=("authorization", "content-type", "x-auth-token"),
 )
 
 # Include routes
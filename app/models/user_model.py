@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Optional
 from pydantic import BaseModel, EmailStr
 
@@ -21,10 +21,11 @@ class User(BaseModel):
     
     def __init__(self, **data):
         super().__init__(**data)
+        now = datetime.now(timezone.utc)
         if self.created_at is None:
-            self.created_at = datetime.utcnow()
+            self.created_at = now
         if self.updated_at is None:
-            self.updated_at = datetime.utcnow()
+            self.updated_at = now
     
     class Config:
         json_schema_extra = {
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, Depends, status, Header
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends, Request, status, Header
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.schemas.user_schema import (
     UserSignupRequest,
@@ -15,10 +15,10 @@ from app.schemas.user_schema import (
     PasswordResetConfirmResponse,
     UserInfoResponse
 )
-from app.services.auth_service import auth_service
-from app.services.email_service import email_service
-from app.utils.jwt_helper import get_email_from_token, verify_token
-from typing import Optional
+from app.services.auth_service import AuthService, get_auth_service
+from app.services.email_service import EmailService, get_email_service
+from app.utils.jwt_helper import verify_token
+from typing import Any, Dict, Optional
 
 
 router = APIRouter(prefix="/api/auth", tags=["Authentication"])
@@ -27,8 +27,39 @@ router = APIRouter(prefix="/api/auth", tags=["Authentication"])
 bearer_scheme = HTTPBearer()
 
 
-@router.post("/signup", response_model=UserSignupResponse, status_code=status.HTTP_201_CREATED)
-async def signup(request: UserSignupRequest):
+def get_token_payload(
+    request: Request,
+    creds: HTTPAuthorizationCredentials = Depends(bearer_scheme)
+) -> Dict[str, Any]:
+    """
+    Verify the bearer token once per request.
+    
+    The payload is stashed on request.state.jwt_payload so anything
+    downstream can reuse it instead of verifying the token again.
+    """
+    payload = getattr(request.state, "jwt_payload", None)
+    if payload is None:
+        payload = verify_token(creds.credentials)
+        if not payload:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid or expired token"
+            )
+        request.state.jwt_payload = payload
+    return payload
+
+
+@router.post(
+    "/signup",
+    status_code=status.HTTP_201_CREATED,
+    responses={status.HTTP_201_CREATED: {"model": UserSignupResponse}}
+)
+async def signup(
+    request: UserSignupRequest,
+    background_tasks: BackgroundTasks,
+    svc: AuthService = Depends(get_auth_service),
+    mailer: EmailService = Depends(get_email_service)
+):
     """
     User signup endpoint.
     
@@ -36,7 +67,7 @@ async def signup(request: UserSignupRequest):
     - Creates user in MongoDB
     - Sends verification email with 6-digit code
     """
-    result = auth_service.register_user(
+    result = await svc.register_user(
         request.email, 
         request.password,
         request.fullname,
@@ -50,25 +81,30 @@ async def signup(request: UserSignupRequest):
             detail=result["message"]
         )
     
-    # Send verification email
+    # Send verification email after the response is returned
     verification_code = result["verification_code"]
-    email_service.send_verification_email(request.email, verification_code)
+    background_tasks.add_task(
+        mailer.send_verification_email, request.email, verification_code
+    )
     
-    return UserSignupResponse(
+    return UserSignupResponse.model_construct(
         email=request.email,
         message="User registered successfully. Please verify your email."
     )
 
 
-@router.post("/verify-email", response_model=VerifyEmailResponse)
-async def verify_email(request: VerifyEmailRequest):
+@router.post("/verify-email", responses={status.HTTP_200_OK: {"model": VerifyEmailResponse}})
+async def verify_email(
+    request: VerifyEmailRequest,
+    svc: AuthService = Depends(get_auth_service)
+):
     """
     Verify user email.
     
     - Accepts email and verification code
     - Marks user as verified if code matches
     """
-    result = auth_service.verify_email(request.email, request.verification_code)
+    result = await svc.verify_email(request.email, request.verification_code)
     
     if not result["success"]:
         raise HTTPException(
@@ -76,11 +112,14 @@ async def verify_email(request: VerifyEmailRequest):
             detail=result["message"]
         )
     
-    return VerifyEmailResponse(message="Email verified successfully")
+    return VerifyEmailResponse.model_construct(message="Email verified successfully")
 
 
-@router.post("/signin", response_model=SignInResponse)
-async def signin(request: SignInRequest):
+@router.post("/signin", responses={status.HTTP_200_OK: {"model": SignInResponse}})
+async def signin(
+    request: SignInRequest,
+    svc: AuthService = Depends(get_auth_service)
+):
     """
     User sign-in endpoint.
     
@@ -88,7 +127,7 @@ async def signin(request: SignInRequest):
     - Returns JWT access token if credentials are valid
     - Requires verified email
     """
-    result = auth_service.authenticate_user(request.email, request.password)
+    result = await svc.authenticate_user(request.email, request.password)
     
     if not result["success"]:
         raise HTTPException(
@@ -96,7 +135,7 @@ async def signin(request: SignInRequest):
             detail=result["message"]
         )
     
-    return SignInResponse(
+    return SignInResponse.model_construct(
         access_token=result["access_token"],
         token_type=result["token_type"],
         expires_in=result["expires_in"],
@@ -104,7 +143,7 @@ async def signin(request: SignInRequest):
     )
 
 
-@router.post("/validate-token", response_model=ValidateTokenResponse)
+@router.post("/validate-token", responses={status.HTTP_200_OK: {"model": ValidateTokenResponse}})
 async def validate_token(request: ValidateTokenRequest):
     """
     Validate JWT access token.
@@ -115,50 +154,63 @@ async def validate_token(request: ValidateTokenRequest):
     payload = verify_token(request.token)
     
     if not payload:
-        return ValidateTokenResponse(
+        return ValidateTokenResponse.model_construct(
             is_valid=False,
             message="Invalid or expired token"
         )
     
     email = payload.get("sub")
-    return ValidateTokenResponse(
+    return ValidateTokenResponse.model_construct(
         is_valid=True,
         email=email,
         message="Token is valid"
     )
 
 
-@router.post("/password-reset", response_model=PasswordResetResponse)
-async def password_reset(request: PasswordResetRequest):
+@router.post("/password-reset", responses={status.HTTP_200_OK: {"model": PasswordResetResponse}})
+async def password_reset(
+    request: PasswordResetRequest,
+    background_tasks: BackgroundTasks,
+    svc: AuthService = Depends(get_auth_service),
+    mailer: EmailService = Depends(get_email_service)
+):
     """
     Initiate password reset.
     
     - Accepts user email
     - Sends password reset email with token
     """
-    result = auth_service.initiate_password_reset(request.email)
+    result = await svc.initiate_password_reset(request.email)
     
     if result["success"]:
-        # Send password reset email
+        # Send password reset email after the response is returned
         reset_token = result.get("reset_token")
         if reset_token:
-            email_service.send_password_reset_email(request.email, reset_token)
+            background_tasks.add_task(
+                mailer.send_password_reset_email, request.email, reset_token
+            )
     
     # Always return success for security (don't reveal if user exists)
-    return PasswordResetResponse(
+    return PasswordResetResponse.model_construct(
         message="Password reset email sent successfully"
     )
 
 
-@router.post("/password-reset-confirm", response_model=PasswordResetConfirmResponse)
-async def password_reset_confirm(request: PasswordResetConfirm):
+@router.post(
+    "/password-reset-confirm",
+    responses={status.HTTP_200_OK: {"model": PasswordResetConfirmResponse}}
+)
+async def password_reset_confirm(
+    request: PasswordResetConfirm,
+    svc: AuthService = Depends(get_auth_service)
+):
     """
     Confirm password reset.
     
     - Accepts email, reset token, and new password
     - Updates password in database
     """
-    result = auth_service.confirm_password_reset(
+    result = await svc.confirm_password_reset(
         request.email,
         request.reset_token,
         request.new_password
@@ -170,7 +222,7 @@ async def password_reset_confirm(request: PasswordResetConfirm):
             detail=result["message"]
         )
     
-    return PasswordResetConfirmResponse(message="Password reset successfully")
+    return PasswordResetConfirmResponse.model_construct(message="Password reset successfully")
 
 
 @router.get("/test-token")
@@ -192,22 +244,18 @@ async def test_token(x_auth_token: str = Header(None)):
     }
 
 
-@router.get("/me", response_model=UserInfoResponse)
-async def get_current_user(token: str = Header(...)):
+@router.get("/me", responses={status.HTTP_200_OK: {"model": UserInfoResponse}})
+async def get_current_user(
+    payload: Dict[str, Any] = Depends(get_token_payload),
+    svc: AuthService = Depends(get_auth_service)
+):
     """
     Get current authenticated user info.
     
-    - Requires valid JWT token in Token header
+    - Requires valid JWT token in Authorization: Bearer header
     """
-    email = get_email_from_token(token)
-    
-    if not email:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired token"
-        )
-    
-    user = auth_service.get_user_by_email(email)
+    email = payload["sub"]
+    user = await svc.get_user_by_email(email)
     
     if not user:
         raise HTTPException(
@@ -215,7 +263,7 @@ async def get_current_user(token: str = Header(...)):
             detail="User not found"
         )
     
-    return UserInfoResponse(
+    return UserInfoResponse.model_construct(
         email=user["email"],
         fullname=user.get("fullname"),
         avatar=user.get("avatar"),
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, field_validator
 from datetime import datetime
 from typing import Optional
 
@@ -6,7 +6,7 @@ from typing import Optional
 class UserSignupRequest(BaseModel):
     """User signup request schema."""
     email: EmailStr
-    password: str = Field(..., min_length=8, description="Password must be at least 8 characters")
+    password: str = Field(..., min_length=8, max_length=72, description="Password must be 8 to 72 characters")
     fullname: Optional[str] = None
     avatar: Optional[str] = None
     dob: Optional[datetime] = None
@@ -21,7 +21,21 @@ class UserSignupResponse(BaseModel):
 class VerifyEmailRequest(BaseModel):
     """Email verification request schema."""
     email: EmailStr
-    verification_code: str = Field(..., pattern="^[0-9]{6}$", description="6-digit verification code")
+    verification_code: str = Field(
+        ...,
+        min_length=6,
+        max_length=6,
+        description="6-digit verification code",
+        json_schema_extra={"pattern": "^[0-9]{6}$"}
+    )
+    
+    @field_validator("verification_code")
+    @classmethod
+    def check_verification_code(cls, v: str) -> str:
+        # isascii() keeps parity with [0-9]; isdigit() alone accepts other Unicode digits
+        if len(v) != 6 or not (v.isascii() and v.isdigit()):
+            raise ValueError("must be 6 digits")
+        return v
 
 
 class VerifyEmailResponse(BaseModel):
@@ -69,7 +83,7 @@ class PasswordResetConfirm(BaseModel):
     """Password reset confirmation schema."""
     email: EmailStr
     reset_token: str
-    new_password: str = Field(..., min_length=8, description="Password must be at least 8 characters")
+    new_password: str = Field(..., min_length=8, max_length=72, description="Password must be 8 to 72 characters")
 
 
 class PasswordResetConfirmResponse(BaseModel):
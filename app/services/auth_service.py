@@ -1,31 +1,48 @@
-import random
-import string
-from datetime import datetime, timedelta
+import secrets
+from datetime import datetime, timedelta, timezone
+from functools import cached_property, lru_cache
 from typing import Optional, Dict, Any
 from bson.objectid import ObjectId
+from cachetools import TTLCache
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from app.config.database import get_db
-from app.utils.password_helper import hash_password, verify_password
+from app.utils.password_helper import hash_password_async, verify_password_async
 from app.utils.jwt_helper import create_access_token
 from app.config.settings import get_settings
 
 
+def generate_verification_code() -> str:
+    """Generate a 6-digit verification code."""
+    return f"{secrets.randbelow(1_000_000):06d}"
+
+
+def generate_reset_token() -> str:
+    """Generate a secure password reset token."""
+    return secrets.token_urlsafe(24)
+
+
 class AuthService:
     """Service for authentication operations."""
     
     def __init__(self):
         self.settings = get_settings()
-        self.users_collection = get_db()["users"]
-    
-    def generate_verification_code(self) -> str:
-        """Generate a 6-digit verification code."""
-        return ''.join(random.choices(string.digits, k=6))
+        self._expires_in = self.settings.jwt_expiration_hours * 3600
+        self._code_ttl = timedelta(minutes=self.settings.verification_code_expiration_minutes)
+        self._reset_ttl = timedelta(hours=self.settings.password_reset_expiration_hours)
+        # Short-lived cache for /me lookups; entries are dropped when the profile changes
+        self._profile_cache = TTLCache(
+            maxsize=self.settings.user_cache_max_size,
+            ttl=self.settings.user_cache_ttl_seconds
+        )
     
-    def generate_reset_token(self) -> str:
-        """Generate a secure password reset token."""
-        return ''.join(random.choices(string.ascii_letters + string.digits, k=32))
+    @cached_property
+    def users_collection(self):
+        """Users collection, resolved on first use after lifespan startup."""
+        return get_db()["users"]
     
-    def register_user(self, email: str, password: str, fullname: Optional[str] = None, 
-                     avatar: Optional[str] = None, dob: Optional[datetime] = None) -> Dict[str, Any]:
+    async def register_user(self, email: str, password: str, fullname: Optional[str] = None, 
+                           avatar: Optional[str] = None, dob: Optional[datetime] = None) -> Dict[str, Any]:
         """
         Register a new user.
         
@@ -39,32 +56,34 @@ class AuthService:
         Returns:
             Dictionary with user info or error
         """
-        # Check if user already exists
-        existing_user = self.users_collection.find_one({"email": email})
-        if existing_user:
-            return {"success": False, "message": "User already exists"}
+        now = datetime.now(timezone.utc)
         
         # Generate verification code
-        verification_code = self.generate_verification_code()
-        code_expires_at = datetime.utcnow() + timedelta(
-            minutes=self.settings.verification_code_expiration_minutes
-        )
+        verification_code = generate_verification_code()
+        code_expires_at = now + self._code_ttl
+        
+        # Hash off the event loop; bcrypt is CPU-bound
+        password_hash = await hash_password_async(password)
         
         # Create user document
         user_doc = {
             "email": email,
-            "password_hash": hash_password(password),
+            "password_hash": password_hash,
             "fullname": fullname,
             "avatar": avatar,
             "dob": dob,
             "is_verified": False,
             "verification_code": verification_code,
             "verification_code_expires_at": code_expires_at,
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
+            "created_at": now,
+            "updated_at": now
         }
         
-        result = self.users_collection.insert_one(user_doc)
+        # The unique email index rejects existing users atomically
+        try:
+            result = await self.users_collection.insert_one(user_doc)
+        except DuplicateKeyError:
+            return {"success": False, "message": "User already exists"}
         
         return {
             "success": True,
@@ -73,7 +92,7 @@ class AuthService:
             "verification_code": verification_code  # In production, don't return this
         }
     
-    def verify_email(self, email: str, verification_code: str) -> Dict[str, Any]:
+    async def verify_email(self, email: str, verification_code: str) -> Dict[str, Any]:
         """
         Verify user email.
         
@@ -84,39 +103,51 @@ class AuthService:
         Returns:
             Dictionary with success status
         """
-        user = self.users_collection.find_one({"email": email})
-        
-        if not user:
-            return {"success": False, "message": "User not found"}
-        
-        if user.get("is_verified"):
-            return {"success": False, "message": "User already verified"}
-        
-        # Check verification code
-        if user.get("verification_code") != verification_code:
-            return {"success": False, "message": "Invalid verification code"}
+        now = datetime.now(timezone.utc)
         
-        # Check expiration
-        expires_at = user.get("verification_code_expires_at")
-        if expires_at and datetime.utcnow() > expires_at:
-            return {"success": False, "message": "Verification code expired"}
-        
-        # Update user
-        self.users_collection.update_one(
-            {"email": email},
+        # Check and consume the code in a single atomic round trip
+        updated = await self.users_collection.find_one_and_update(
             {
+                "email": email,
+                "is_verified": False,
+                "verification_code": verification_code,
+                "verification_code_expires_at": {"$gt": now}
+            },
+            # Pipeline update so updated_at is stamped by the server clock
+            [{
                 "$set": {
                     "is_verified": True,
                     "verification_code": None,
                     "verification_code_expires_at": None,
-                    "updated_at": datetime.utcnow()
+                    "updated_at": "$$NOW"
                 }
-            }
+            }],
+            projection={"_id": 1},
+            return_document=ReturnDocument.AFTER
         )
         
+        if not updated:
+            # Look the user up again only to report why it failed
+            user = await self.users_collection.find_one(
+                {"email": email},
+                {"verification_code": 1, "verification_code_expires_at": 1, "is_verified": 1}
+            )
+            
+            if not user:
+                return {"success": False, "message": "User not found"}
+            
+            if user.get("is_verified"):
+                return {"success": False, "message": "User already verified"}
+            
+            if user.get("verification_code") != verification_code:
+                return {"success": False, "message": "Invalid verification code"}
+            
+            return {"success": False, "message": "Verification code expired"}
+        
+        self._profile_cache.pop(email, None)
         return {"success": True, "message": "Email verified successfully"}
     
-    def authenticate_user(self, email: str, password: str) -> Dict[str, Any]:
+    async def authenticate_user(self, email: str, password: str) -> Dict[str, Any]:
         """
         Authenticate user and generate JWT token.
         
@@ -127,7 +158,10 @@ class AuthService:
         Returns:
             Dictionary with token or error
         """
-        user = self.users_collection.find_one({"email": email})
+        user = await self.users_collection.find_one(
+            {"email": email},
+            {"password_hash": 1, "is_verified": 1, "_id": 0}
+        )
         
         if not user:
             return {"success": False, "message": "Invalid credentials"}
@@ -135,21 +169,21 @@ class AuthService:
         if not user.get("is_verified"):
             return {"success": False, "message": "Email not verified"}
         
-        if not verify_password(password, user.get("password_hash")):
+        if not await verify_password_async(password, user.get("password_hash")):
             return {"success": False, "message": "Invalid credentials"}
         
         # Generate JWT token
-        access_token = create_access_token({"sub": email})
+        access_token = create_access_token({"sub": email}, copy=False)
         
         return {
             "success": True,
             "access_token": access_token,
             "token_type": "bearer",
-            "expires_in": self.settings.jwt_expiration_hours * 3600,
+            "expires_in": self._expires_in,
             "email": email
         }
     
-    def initiate_password_reset(self, email: str) -> Dict[str, Any]:
+    async def initiate_password_reset(self, email: str) -> Dict[str, Any]:
         """
         Initiate password reset process.
         
@@ -159,35 +193,32 @@ class AuthService:
         Returns:
             Dictionary with reset token
         """
-        user = self.users_collection.find_one({"email": email})
-        
-        if not user:
-            # Return success even if user doesn't exist for security
-            return {"success": True, "message": "Password reset email sent if user exists"}
-        
-        reset_token = self.generate_reset_token()
-        token_expires_at = datetime.utcnow() + timedelta(
-            hours=self.settings.password_reset_expiration_hours
-        )
+        reset_token = generate_reset_token()
+        token_expires_at = datetime.now(timezone.utc) + self._reset_ttl
         
-        self.users_collection.update_one(
+        # Update blindly and use matched_count as the existence check
+        result = await self.users_collection.update_one(
             {"email": email},
-            {
+            [{
                 "$set": {
-                    "password_reset_token": reset_token,
+                    "password_reset_token": {"$literal": reset_token},
                     "password_reset_token_expires_at": token_expires_at,
-                    "updated_at": datetime.utcnow()
+                    "updated_at": "$$NOW"
                 }
-            }
+            }]
         )
         
+        if not result.matched_count:
+            # Return success even if user doesn't exist for security
+            return {"success": True, "message": "Password reset email sent if user exists"}
+        
         return {
             "success": True,
             "reset_token": reset_token,  # In production, send via email only
             "message": "Password reset email sent"
         }
     
-    def confirm_password_reset(self, email: str, reset_token: str, new_password: str) -> Dict[str, Any]:
+    async def confirm_password_reset(self, email: str, reset_token: str, new_password: str) -> Dict[str, Any]:
         """
         Confirm password reset and update password.
         
@@ -199,39 +230,93 @@ class AuthService:
         Returns:
             Dictionary with success status
         """
-        user = self.users_collection.find_one({"email": email})
-        
-        if not user:
-            return {"success": False, "message": "User not found"}
-        
-        # Verify reset token
-        if user.get("password_reset_token") != reset_token:
-            return {"success": False, "message": "Invalid reset token"}
-        
-        # Check expiration
-        expires_at = user.get("password_reset_token_expires_at")
-        if expires_at and datetime.utcnow() > expires_at:
-            return {"success": False, "message": "Reset token expired"}
+        now = datetime.now(timezone.utc)
         
-        # Update password
-        self.users_collection.update_one(
-            {"email": email},
+        # Consume the token atomically first so bad tokens never reach bcrypt
+        # and concurrent replays of the same token cannot both succeed
+        updated = await self.users_collection.find_one_and_update(
             {
+                "email": email,
+                "password_reset_token": reset_token,
+                "password_reset_token_expires_at": {"$gt": now}
+            },
+            [{
                 "$set": {
-                    "password_hash": hash_password(new_password),
                     "password_reset_token": None,
-                    "password_reset_token_expires_at": None,
-                    "updated_at": datetime.utcnow()
+                    "password_reset_token_expires_at": None
                 }
-            }
+            }],
+            projection={"_id": 1, "password_reset_token_expires_at": 1},
+            return_document=ReturnDocument.BEFORE
         )
         
+        if not updated:
+            # Look the user up again only to report why it failed
+            user = await self.users_collection.find_one(
+                {"email": email},
+                {"password_reset_token": 1, "password_reset_token_expires_at": 1}
+            )
+            
+            if not user:
+                return {"success": False, "message": "User not found"}
+            
+            if user.get("password_reset_token") != reset_token:
+                return {"success": False, "message": "Invalid reset token"}
+            
+            return {"success": False, "message": "Reset token expired"}
+        
+        try:
+            password_hash = await hash_password_async(new_password)
+            await self.users_collection.update_one(
+                {"_id": updated["_id"]},
+                # bcrypt hashes start with "$", so they must be wrapped in $literal
+                [{
+                    "$set": {
+                        "password_hash": {"$literal": password_hash},
+                        "updated_at": "$$NOW"
+                    }
+                }]
+            )
+        except Exception:
+            # Give the token back so the user can retry, unless a new one was issued meanwhile
+            await self.users_collection.update_one(
+                {"_id": updated["_id"], "password_reset_token": None},
+                {
+                    "$set": {
+                        "password_reset_token": reset_token,
+                        "password_reset_token_expires_at": updated["password_reset_token_expires_at"]
+                    }
+                }
+            )
+            raise
+        
+        self._profile_cache.pop(email, None)
         return {"success": True, "message": "Password reset successfully"}
     
-    def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
-        """Get user by email."""
-        return self.users_collection.find_one({"email": email})
+    async def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        """Get the public profile fields of a user by email (cached briefly)."""
+        user = self._profile_cache.get(email)
+        if user is not None:
+            return user
+        
+        user = await self.users_collection.find_one(
+            {"email": email},
+            {
+                "email": 1,
+                "fullname": 1,
+                "avatar": 1,
+                "dob": 1,
+                "is_verified": 1,
+                "created_at": 1,
+                "_id": 0
+            }
+        )
+        if user is not None:
+            self._profile_cache[email] = user
+        return user
 
 
-# Singleton instance
-auth_service = AuthService()
+@lru_cache(maxsize=1)
+def get_auth_service() -> AuthService:
+    """Dependency injection for the auth service."""
+    return AuthService()
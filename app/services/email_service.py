@@ -1,27 +1,282 @@
+import atexit
+import base64
 import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+import ssl
+import string
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from email import policy as email_policy
 from email import utils as email_utils
-from typing import List
+from email.message import EmailMessage
+from typing import List, Optional, Tuple
 import logging
 from app.config.settings import get_settings
 
 
 logger = logging.getLogger(__name__)
 
+_SETTINGS = get_settings()
+
+# Email templates, parsed once at import; only the dynamic fields vary per send
+_VERIFY_SUBJECT = "Email Verification - Sevico"
+_VERIFY_HTML_TMPL = string.Template("""
+<html>
+    <body style="font-family: Arial, sans-serif;">
+        <h2>Email Verification</h2>
+        <p>Hello,</p>
+        <p>Your verification code is:</p>
+        <h1 style="color: #007bff; letter-spacing: 5px;">${code}</h1>
+        <p>This code will expire in ${minutes} minutes.</p>
+        <p>If you didn't request this, please ignore this email.</p>
+        <br>
+        <p>Best regards,<br>Sevico Team</p>
+    </body>
+</html>
+""")
+
+_RESET_SUBJECT = "Password Reset - Sevico"
+_RESET_HTML_TMPL = string.Template("""
+<html>
+    <body style="font-family: Arial, sans-serif;">
+        <h2>Password Reset Request</h2>
+        <p>Hello,</p>
+        <p>We received a request to reset your password. Use the token below:</p>
+        <code style="background-color: #f5f5f5; padding: 10px; display: block; margin: 10px 0;">
+            ${token}
+        </code>
+        <p>This token will expire in ${hours} hour(s).</p>
+        <p>If you didn't request this, please ignore this email.</p>
+        <br>
+        <p>Best regards,<br>Sevico Team</p>
+    </body>
+</html>
+""")
+
+# Settings are fixed per process, so bake them in and split around the one
+# per-message slot; sends then only concatenate
+_VERIFY_HTML_PREFIX, _VERIFY_HTML_SUFFIX = _VERIFY_HTML_TMPL.safe_substitute(
+    minutes=_SETTINGS.verification_code_expiration_minutes
+).split("${code}")
+_RESET_HTML_PREFIX, _RESET_HTML_SUFFIX = _RESET_HTML_TMPL.safe_substitute(
+    hours=_SETTINGS.password_reset_expiration_hours
+).split("${token}")
+
+# Loaded once so CA certificates aren't re-read on every connect
+_SSL_CTX = ssl.create_default_context()
+
+# Re-dial periodically so a single session is not held open indefinitely
+_MAX_SENDS_PER_CONN = 10_000
+
+
+class _PreencodedAuthSMTP(smtplib.SMTP):
+    """SMTP client that authenticates with credentials base64-encoded up front."""
+    
+    def __init__(self, *args, auth_plain_b64: str, auth_user_b64: str, auth_pass_b64: str,
+                 **kwargs):
+        self._auth_plain_b64 = auth_plain_b64
+        self._auth_user_b64 = auth_user_b64
+        self._auth_pass_b64 = auth_pass_b64
+        super().__init__(*args, **kwargs)
+    
+    def _login_preencoded(self, user: str, password: str):
+        """
+        Log in with the pre-encoded credentials via AUTH PLAIN or LOGIN.
+        
+        user/password must be the credentials the payloads were encoded from;
+        they are only used for smtplib's login when neither mechanism is offered.
+        login() itself is left untouched, so explicit calls use their arguments.
+        """
+        self.ehlo_or_helo_if_needed()
+        if not self.has_extn("auth"):
+            raise smtplib.SMTPNotSupportedError("SMTP AUTH extension not supported by server.")
+        
+        advertised = self.esmtp_features["auth"].upper().split()
+        if "PLAIN" in advertised:
+            code, resp = self.docmd("AUTH", "PLAIN " + self._auth_plain_b64)
+        elif "LOGIN" in advertised:
+            code, resp = self.docmd("AUTH", "LOGIN " + self._auth_user_b64)
+            if code == 334:
+                code, resp = self.docmd(self._auth_pass_b64)
+        else:
+            return self.login(user, password)
+        
+        if code not in (235, 503):
+            raise smtplib.SMTPAuthenticationError(code, resp)
+        return code, resp
+
+
+class _FastSMTP(_PreencodedAuthSMTP):
+    """Plain SMTP client, upgraded with STARTTLS when configured."""
+
+
+class _FastSMTPSSL(_PreencodedAuthSMTP, smtplib.SMTP_SSL):
+    """SMTP client over implicit TLS (SMTPS)."""
+
 
 class EmailService:
     """Service for sending emails via SMTP."""
     
     def __init__(self):
-        self.settings = get_settings()
+        self.settings = _SETTINGS
+        # Snapshot per-send settings into plain attributes
+        s = self.settings
+        if not s.smtp_host or not s.sender_email:
+            raise ValueError("SMTP_HOST and SENDER_EMAIL must be configured to send email")
+        self._from_header = email_utils.formataddr((s.sender_name, s.sender_email))
+        self._sender_email = s.sender_email
+        self._smtp_host = s.smtp_host
+        self._smtp_port = s.smtp_port
+        self._smtp_tls = s.smtp_tls
+        self._smtp_use_ssl = s.smtp_use_ssl or s.smtp_port == 465
+        self._smtp_timeout = s.smtp_timeout_seconds or 30
+        self._smtp_user = s.smtp_username
+        self._smtp_pw = s.smtp_password
+        self._ses_config_set = s.aws_ses_configuration_set
+        # Pre-encoded AUTH payloads so re-dials skip the base64 work
+        self._auth_plain_b64 = base64.b64encode(
+            f"\0{self._smtp_user}\0{self._smtp_pw}".encode()
+        ).decode("ascii")
+        self._auth_user_b64 = base64.b64encode(self._smtp_user.encode()).decode("ascii")
+        self._auth_pass_b64 = base64.b64encode(self._smtp_pw.encode()).decode("ascii")
+        # One long-lived SMTP session shared by all sends
+        self._conn: Optional[smtplib.SMTP] = None
+        self._conn_lock = threading.Lock()
+        self._conn_sends = 0
+        # Worker thread for fire-and-forget sends; sends serialise on
+        # _conn_lock, so more workers would only queue behind it
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="smtp")
+        atexit.register(self._close)
+    
+    def _open_conn(self) -> smtplib.SMTP:
+        """Open and authenticate a new SMTP connection."""
+        auth = {
+            "auth_plain_b64": self._auth_plain_b64,
+            "auth_user_b64": self._auth_user_b64,
+            "auth_pass_b64": self._auth_pass_b64,
+        }
+        server: _PreencodedAuthSMTP
+        if self._smtp_use_ssl:
+            # Implicit TLS: encrypted from the first byte, no STARTTLS round trips
+            server = _FastSMTPSSL(
+                self._smtp_host,
+                self._smtp_port,
+                timeout=self._smtp_timeout,
+                context=_SSL_CTX,
+                **auth
+            )
+        else:
+            server = _FastSMTP(self._smtp_host, self._smtp_port, timeout=self._smtp_timeout, **auth)
+        try:
+            if not self._smtp_use_ssl:
+                # Proper EHLO/STARTTLS sequence for AWS SES
+                server.ehlo()
+                if self._smtp_tls:
+                    server.starttls(context=_SSL_CTX)
+                    server.ehlo()  # EHLO again after STARTTLS
+            server._login_preencoded(self._smtp_user, self._smtp_pw)
+        except (smtplib.SMTPException, OSError):
+            # Don't leak a half-open socket when the handshake fails or times out
+            server.close()
+            raise
+        return server
+    
+    def _drop_conn(self):
+        """Close the current SMTP connection. Caller must hold _conn_lock."""
+        if self._conn is not None:
+            try:
+                self._conn.quit()
+            except (smtplib.SMTPException, OSError):
+                self._conn.close()
+            self._conn = None
+    
+    def _get_conn(self) -> smtplib.SMTP:
+        """
+        Return a healthy SMTP connection, re-dialling if needed.
+        Caller must hold _conn_lock.
+        """
+        if self._conn is not None and self._conn_sends >= _MAX_SENDS_PER_CONN:
+            self._drop_conn()
+        
+        if self._conn is not None:
+            try:
+                if self._conn.noop()[0] != 250:
+                    self._drop_conn()
+            except (smtplib.SMTPException, OSError):
+                self._drop_conn()
+        
+        if self._conn is None:
+            self._conn = self._open_conn()
+            self._conn_sends = 0
+        return self._conn
+    
+    def _deliver(self, message: EmailMessage, recipient_email: str, reuse: bool = False):
+        """
+        Send one message over the shared connection.
+        
+        The lock is held only for this message so batches interleave with
+        other sends. With reuse=True an open session skips the NOOP check.
+        RSET leaves the session clean for the next message. A message the
+        server rejects keeps the session, since smtplib has already sent RSET;
+        a dropped connection or any other error closes it so the next send
+        re-dials.
+        """
+        with self._conn_lock:
+            if reuse and self._conn is not None and self._conn_sends < _MAX_SENDS_PER_CONN:
+                conn = self._conn
+            else:
+                conn = self._get_conn()
+            try:
+                conn.send_message(message, self._sender_email, recipient_email)
+                conn.rset()
+            except (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException):
+                # smtplib closes the socket itself on a 421 reply
+                if conn.sock is None:
+                    self._drop_conn()
+                else:
+                    self._conn_sends += 1
+                raise
+            except Exception:
+                self._drop_conn()
+                raise
+            self._conn_sends += 1
+    
+    def _close(self):
+        """Close the persistent SMTP connection on shutdown."""
+        self._executor.shutdown(wait=True)
+        with self._conn_lock:
+            self._drop_conn()
+    
+    def _build_message(
+        self,
+        recipient_email: str,
+        subject: str,
+        html_content: str,
+        plain_text: Optional[str],
+        html_cte: Optional[str] = None
+    ) -> EmailMessage:
+        """Build a multipart/alternative message with plain text and HTML parts."""
+        message = EmailMessage(policy=email_policy.SMTP)
+        message["Subject"] = subject
+        message["From"] = self._from_header
+        message["To"] = recipient_email
+        
+        # Add AWS SES Configuration Set if configured
+        if self._ses_config_set:
+            message.add_header('X-SES-CONFIGURATION-SET', self._ses_config_set)
+        
+        # Plain text part with the HTML part as its alternative
+        message.set_content(plain_text or "")
+        message.add_alternative(html_content, subtype="html", cte=html_cte)
+        return message
     
     def send_email(
         self,
         recipient_email: str,
         subject: str,
         html_content: str,
-        plain_text: str = None
+        plain_text: str = None,
+        html_cte: Optional[str] = None
     ) -> bool:
         """
         Send an email via SMTP (supports AWS SES, Gmail, etc).
@@ -31,44 +286,89 @@ class EmailService:
             subject: Email subject
             html_content: HTML content of email
             plain_text: Plain text fallback
+            html_cte: Content-Transfer-Encoding for the HTML part (auto-detected if None)
             
         Returns:
             True if sent successfully, False otherwise
         """
         try:
-            message = MIMEMultipart("alternative")
-            message["Subject"] = subject
-            message["From"] = email_utils.formataddr((self.settings.sender_name, self.settings.sender_email))
-            message["To"] = recipient_email
-            
-            # Add AWS SES Configuration Set if configured
-            if self.settings.aws_ses_configuration_set:
-                message.add_header('X-SES-CONFIGURATION-SET', self.settings.aws_ses_configuration_set)
-            
-            # Add plain text part
-            if plain_text:
-                message.attach(MIMEText(plain_text, "plain"))
-            
-            # Add HTML part
-            message.attach(MIMEText(html_content, "html"))
+            message = self._build_message(
+                recipient_email, subject, html_content, plain_text, html_cte
+            )
+            self._deliver(message, recipient_email)
             
-            # Send email with proper EHLO/STARTTLS sequence for AWS SES
-            server = smtplib.SMTP(self.settings.smtp_host, self.settings.smtp_port)
-            server.ehlo()
-            if self.settings.smtp_tls:
-                server.starttls()
-                server.ehlo()  # EHLO again after STARTTLS
-            server.login(self.settings.smtp_username, self.settings.smtp_password)
-            server.sendmail(self.settings.sender_email, recipient_email, message.as_string())
-            server.close()
-            
-            logger.info(f"Email sent successfully to {recipient_email}")
+            logger.info("Email sent successfully to %s", recipient_email)
             return True
         
-        except Exception as e:
-            logger.error(f"Failed to send email to {recipient_email}: {str(e)}")
+        except (smtplib.SMTPException, OSError) as e:
+            # Only delivery failures are reported here; programming errors propagate
+            logger.error("Failed to send email to %s: %s", recipient_email, e)
             return False
     
+    def send_many(self, items: List[Tuple[str, str, str, Optional[str]]]) -> int:
+        """
+        Send several emails over the shared SMTP session.
+        
+        The connection lock is taken per message, so other sends are not held
+        up by a large batch. A rejected message keeps the session; a dropped
+        connection makes the next message re-dial. Failures do not stop the
+        batch unless more than a third fail.
+        
+        Args:
+            items: (recipient_email, subject, html_content, plain_text) tuples
+            
+        Returns:
+            Number of emails sent successfully
+        """
+        sent = 0
+        failed = 0
+        max_failures = len(items) // 3
+        
+        for i, (recipient_email, subject, html_content, plain_text) in enumerate(items):
+            message = self._build_message(recipient_email, subject, html_content, plain_text)
+            try:
+                # Health-check the session once, then reuse it for the rest of the batch
+                self._deliver(message, recipient_email, reuse=i > 0)
+            except (smtplib.SMTPException, OSError) as e:
+                logger.error("Failed to send email to %s: %s", recipient_email, e)
+                failed += 1
+                if failed > max_failures:
+                    logger.error("Aborting email batch after %d failures", failed)
+                    break
+                continue
+            sent += 1
+        
+        logger.info("Sent %d of %d emails in batch", sent, len(items))
+        return sent
+    
+    def send_email_async(
+        self,
+        recipient_email: str,
+        subject: str,
+        html_content: str,
+        plain_text: str = None,
+        html_cte: Optional[str] = None
+    ) -> "Future[bool]":
+        """
+        Queue an email for sending on the service's worker thread.
+        
+        This only moves the send off the caller's thread; it does not send in
+        parallel, since all sends share one SMTP session.
+        
+        Args:
+            recipient_email: Recipient email address
+            subject: Email subject
+            html_content: HTML content of email
+            plain_text: Plain text fallback
+            html_cte: Content-Transfer-Encoding for the HTML part (auto-detected if None)
+            
+        Returns:
+            Future resolving to True if sent successfully, False otherwise
+        """
+        return self._executor.submit(
+            self.send_email, recipient_email, subject, html_content, plain_text, html_cte
+        )
+    
     def send_verification_email(self, email: str, verification_code: str) -> bool:
         """
         Send email verification code.
@@ -80,25 +380,11 @@ class EmailService:
         Returns:
             True if sent successfully
         """
-        subject = "Email Verification - Sevico"
-        html_content = f"""
-        <html>
-            <body style="font-family: Arial, sans-serif;">
-                <h2>Email Verification</h2>
-                <p>Hello,</p>
-                <p>Your verification code is:</p>
-                <h1 style="color: #007bff; letter-spacing: 5px;">{verification_code}</h1>
-                <p>This code will expire in {self.settings.verification_code_expiration_minutes} minutes.</p>
-                <p>If you didn't request this, please ignore this email.</p>
-                <br>
-                <p>Best regards,<br>Sevico Team</p>
-            </body>
-        </html>
-        """
-        
+        html_content = _VERIFY_HTML_PREFIX + verification_code + _VERIFY_HTML_SUFFIX
         plain_text = f"Your verification code is: {verification_code}"
         
-        return self.send_email(email, subject, html_content, plain_text)
+        # The body is pure ASCII, so skip the transfer-encoding scan
+        return self.send_email(email, _VERIFY_SUBJECT, html_content, plain_text, html_cte="7bit")
     
     def send_password_reset_email(self, email: str, reset_token: str) -> bool:
         """
@@ -111,28 +397,14 @@ class EmailService:
         Returns:
             True if sent successfully
         """
-        subject = "Password Reset - Sevico"
-        html_content = f"""
-        <html>
-            <body style="font-family: Arial, sans-serif;">
-                <h2>Password Reset Request</h2>
-                <p>Hello,</p>
-                <p>We received a request to reset your password. Use the token below:</p>
-                <code style="background-color: #f5f5f5; padding: 10px; display: block; margin: 10px 0;">
-                    {reset_token}
-                </code>
-                <p>This token will expire in {self.settings.password_reset_expiration_hours} hour(s).</p>
-                <p>If you didn't request this, please ignore this email.</p>
-                <br>
-                <p>Best regards,<br>Sevico Team</p>
-            </body>
-        </html>
-        """
-        
+        html_content = _RESET_HTML_PREFIX + reset_token + _RESET_HTML_SUFFIX
         plain_text = f"Your password reset token is: {reset_token}"
         
-        return self.send_email(email, subject, html_content, plain_text)
+        # The body is pure ASCII, so skip the transfer-encoding scan
+        return self.send_email(email, _RESET_SUBJECT, html_content, plain_text, html_cte="7bit")
 
 
-# Singleton instance
-email_service = EmailService()
+@lru_cache(maxsize=1)
+def get_email_service() -> EmailService:
+    """Dependency injection for the email service."""
+    return EmailService()
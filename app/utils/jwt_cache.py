@@ -0,0 +1,58 @@
+import hashlib
+import threading
+import time
+from typing import Optional, Dict, Any
+from cachetools import TTLCache
+
+
+# Verified payloads keyed by SHA-256 of the token, so raw tokens are never stored
+_cache: TTLCache = TTLCache(maxsize=10_000, ttl=5)
+_lock = threading.RLock()
+
+
+def _token_key(token: str) -> bytes:
+    """Hash a token into a fixed-size cache key."""
+    return hashlib.sha256(token.encode()).digest()
+
+
+def get_cached_payload(token: str) -> Optional[Dict[str, Any]]:
+    """
+    Look up a previously verified token payload.
+    
+    Args:
+        token: JWT token
+        
+    Returns:
+        Cached payload if present and not yet expired, None otherwise
+    """
+    key = _token_key(token)
+    with _lock:
+        entry = _cache.get(key)
+    if entry is None:
+        return None
+    
+    payload, exp = entry
+    # Never serve a token past its own expiry, even within the cache TTL
+    if exp <= time.time():
+        with _lock:
+            _cache.pop(key, None)
+        return None
+    return payload
+
+
+def cache_payload(token: str, payload: Dict[str, Any]):
+    """
+    Store a verified token payload.
+    
+    Args:
+        token: JWT token
+        payload: Decoded and verified payload
+    """
+    with _lock:
+        _cache[_token_key(token)] = (payload, payload["exp"])
+
+
+def clear_cache():
+    """Drop all cached payloads."""
+    with _lock:
+        _cache.clear()
@@ -1,33 +1,55 @@
-from datetime import datetime, timedelta
+import base64
+import json
+from datetime import datetime, timedelta, timezone
 from typing import Optional, Dict, Any
-from jose import JWTError, jwt
+import jwt
+from jwt import InvalidTokenError as JWTError
 from app.config.settings import get_settings
+from app.utils.jwt_cache import get_cached_payload, cache_payload
 
 
-def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
+_SETTINGS = get_settings()
+_DEFAULT_EXPIRES = timedelta(hours=_SETTINGS.jwt_expiration_hours)
+
+# Only exp and sub are issued, so skip validators for claims we never set
+_DECODE_OPTIONS = {
+    "verify_signature": True,
+    "verify_aud": False,
+    "verify_iss": False,
+    "verify_iat": False,
+    "verify_nbf": False,
+    "require": ["exp", "sub"],
+}
+
+
+def create_access_token(
+    data: Dict[str, Any],
+    expires_delta: Optional[timedelta] = None,
+    copy: bool = True
+) -> str:
     """
     Create a JWT access token.
     
     Args:
         data: Payload data to encode
         expires_delta: Token expiration time delta
+        copy: Set False to add "exp" to a throwaway data dict in place
         
     Returns:
         Encoded JWT token
     """
-    settings = get_settings()
-    to_encode = data.copy()
+    expire = datetime.now(timezone.utc) + (expires_delta or _DEFAULT_EXPIRES)
     
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+    if copy:
+        to_encode = {**data, "exp": expire}
     else:
-        expire = datetime.utcnow() + timedelta(hours=settings.jwt_expiration_hours)
+        to_encode = data
+        to_encode["exp"] = expire
     
-    to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(
         to_encode,
-        settings.jwt_secret_key,
-        algorithm=settings.jwt_algorithm
+        _SETTINGS.jwt_secret_key,
+        algorithm=_SETTINGS.jwt_algorithm
     )
     return encoded_jwt
 
@@ -42,19 +64,26 @@ def verify_token(token: str) -> Optional[Dict[str, Any]]:
     Returns:
         Decoded payload if valid, None if invalid
     """
-    settings = get_settings()
+    if _SETTINGS.jwt_verify_cache_enabled:
+        cached = get_cached_payload(token)
+        if cached is not None:
+            return cached
+    
     try:
+        # PyJWT enforces the presence of exp and sub itself; the explicit
+        # algorithms list keeps "none" and algorithm-swap tokens out
         payload = jwt.decode(
             token,
-            settings.jwt_secret_key,
-            algorithms=[settings.jwt_algorithm]
+            _SETTINGS.jwt_secret_key,
+            algorithms=[_SETTINGS.jwt_algorithm],
+            options=_DECODE_OPTIONS
         )
-        email: str = payload.get("sub")
-        if email is None:
-            return None
-        return payload
     except JWTError:
         return None
+    
+    if _SETTINGS.jwt_verify_cache_enabled:
+        cache_payload(token, payload)
+    return payload
 
 
 def decode_token(token: str) -> Optional[Dict[str, Any]]:
@@ -67,11 +96,13 @@ def decode_token(token: str) -> Optional[Dict[str, Any]]:
     Returns:
         Decoded payload if valid, None if invalid
     """
+    # No crypto involved, so decode the claims segment directly
     try:
-        payload = jwt.get_unverified_claims(token)
-        return payload
-    except JWTError:
+        segment = token.split(".", 2)[1]
+        payload = json.loads(base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4)))
+    except (IndexError, ValueError):
         return None
+    return payload if isinstance(payload, dict) else None
 
 
 def get_email_from_token(token: str) -> Optional[str]:
@@ -86,5 +117,5 @@ def get_email_from_token(token: str) -> Optional[str]:
     """
     payload = verify_token(token)
     if payload:
-        return payload.get("sub")
+        return payload["sub"]
     return None
@@ -1,9 +1,37 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 from passlib.context import CryptContext
 
 
 # Configure password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Dedicated pool for bcrypt work, installed during application startup
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def start_password_executor() -> ThreadPoolExecutor:
+    """
+    Create the thread pool used for password hashing.
+    
+    Returns:
+        The password hashing executor
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix="bcrypt")
+    return _executor
+
+
+def shutdown_password_executor():
+    """Shut down the password hashing thread pool."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+
 
 def hash_password(password: str) -> str:
     """
@@ -30,3 +58,32 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         True if password matches, False otherwise
     """
     return pwd_context.verify(plain_password, hashed_password)
+
+
+async def hash_password_async(password: str) -> str:
+    """
+    Hash a password without blocking the event loop.
+    
+    Args:
+        password: Plain text password
+        
+    Returns:
+        Hashed password
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password without blocking the event loop.
+    
+    Args:
+        plain_password: Plain text password to verify
+        hashed_password: Hashed password from database
+        
+    Returns:
+        True if password matches, False otherwise
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, verify_password, plain_password, hashed_password)